@@ -22,6 +22,9 @@ FONT = "DejaVu18"
 STARTUP_DISPLAY_DELAY = 5
 NORMAL_BRIGHTNESS_PERCENT = 100 # Default: 100
 DIM_BRIGHTNESS_PERCENT = 20 # Default: 20
+HISTORY_PAGE_SIZE = 4  # Events per history page (2 lines each)
+HISTORY_IDLE_TIMEOUT = 30  # Seconds without a touch before leaving the history screen
+TOUCH_POLL_MS = 100  # Touch polling interval while waiting for the next check
 
 # -- Network & API Configuration --
 WIFI_MAX_RETRIES = 2
@@ -30,6 +33,11 @@ WIFI_MAX_WAIT = 10
 HTTP_TIMEOUT = 30
 EMSC_BASE_URL = "https://www.seismicportal.eu/fdsnws/event/1/query"
 
+# -- Event Log Configuration --
+EVENT_LOG_DIR = "/events"
+EVENT_LOG_SEGMENT_RECORDS = 256  # Records per segment file (64 bytes each)
+EVENT_LOG_MAX_BYTES = 512 * 1024  # Oldest segments are deleted above this size
+
 # -- Data & Formatting Configuration --
 EARTH_RADIUS_KM = 6371
 PLACE_NAME_MAX_LENGTH = 25
@@ -80,4 +80,33 @@ def play_tone_alert(magnitude):
             if i < num_signals - 1:
                 time.sleep(0.8)
     except Exception as e:
-        print("Speaker error:", e) 
\ No newline at end of file
+        print("Speaker error:", e)
+
+_touch_was_down = False
+
+def read_touch_zone(top_height=0):
+    """
+    Return 'top', 'left', 'center' or 'right' for a new touch on the screen, None otherwise.
+    Touches within top_height pixels of the top edge are reported as 'top'.
+    """
+    global _touch_was_down
+    try:
+        M5.update()
+        touching = M5.Touch.getCount() > 0
+        zone = None
+        if touching and not _touch_was_down:
+            third = M5.Display.width() // 3
+            x = M5.Touch.getX()
+            if M5.Touch.getY() < top_height:
+                zone = "top"
+            elif x < third:
+                zone = "left"
+            elif x < 2 * third:
+                zone = "center"
+            else:
+                zone = "right"
+        _touch_was_down = touching
+        return zone
+    except Exception as e:
+        print("Touch error:", e)
+        return None
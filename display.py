@@ -3,9 +3,10 @@ import time
 from config import (
     FONT, LINE_HEIGHT, MAX_LINES, MONITOR_LATITUDE, MONITOR_LONGITUDE,
     MONITOR_RADIUS_KM, STARTUP_DISPLAY_DELAY, API_QUERY_PERIOD_MINUTES,
-    PLACE_NAME_MAX_LENGTH
+    PLACE_NAME_MAX_LENGTH, HISTORY_PAGE_SIZE, HISTORY_IDLE_TIMEOUT, TOUCH_POLL_MS
 )
-from utils import format_event_time
+from utils import format_event_time, format_log_time
+from device import read_touch_zone
 
 # -- UI Colors --
 COLOR_BLACK = 0x000000
@@ -19,6 +20,9 @@ COLOR_DARK_BLUE = 0x00008B
 COLOR_YELLOW = 0xFFFF00
 COLOR_DARK_YELLOW = 0xCCCC00
 
+# -- Layout --
+TITLE_HEIGHT = 30
+
 # -- Message Formats --
 MESSAGES = {
     "STARTUP": "EARTHQUAKE MONITOR\n\nStarting...\n\nLat: {:.2f}\nLon: {:.2f}\nRadius: {}km",
@@ -32,6 +36,10 @@ MESSAGES = {
     "EARTHQUAKE": "!!! EARTHQUAKE !!!\n\nMag: {:.1f}\n{}\nDist: {:.0f}km\n\nTime: {}",
     "STOPPING": "STOPPING...",
     "RUNTIME_ERROR": "RUNTIME ERROR\n\n{}\n\nRestarting loop...",
+    "HISTORY": "HISTORY {}/{}  [-1 day]",
+    "HISTORY_ENTRY": "{} M{:.1f} {:.0f}km\n{}",
+    "HISTORY_NAV": "< older     exit     newer >",
+    "HISTORY_EMPTY": "HISTORY\n\nNo events logged yet\n\nTap to exit",
 }
 
 def _display_template(text, title_bg_color):
@@ -49,7 +57,7 @@ def _display_template(text, title_bg_color):
         screen_height = M5.Display.height()
 
         # --- Draw Title Bar ---
-        title_height = 30
+        title_height = TITLE_HEIGHT
         M5.Lcd.fillRect(0, 0, screen_width, title_height, title_bg_color)
 
         # --- Draw Title Text ---
@@ -127,4 +135,52 @@ def format_earthquake_message(earthquake, total_found, check_timestamp):
             place_short,
             earthquake['distance'],
             event_time_str
-        ), "alert" 
\ No newline at end of file
+        ), "alert"
+
+def show_history_page(event_log, page, total_pages):
+    """Display one page of logged earthquakes, newest first"""
+    lines = [MESSAGES["HISTORY"].format(page + 1, total_pages)]
+    events = event_log.read_page(page, HISTORY_PAGE_SIZE)
+    for event in events:
+        lines.append(MESSAGES["HISTORY_ENTRY"].format(
+            format_log_time(event['time']),
+            event['magnitude'],
+            event['distance'],
+            event['place'][:PLACE_NAME_MAX_LENGTH]
+        ))
+    lines.append(MESSAGES["HISTORY_NAV"])
+    display_info("\n".join(lines))
+    return events
+
+def browse_history(event_log):
+    """
+    Page through the event log by touch until exit is tapped or the screen is idle.
+    Tapping the title bar jumps back one day using the log's time index.
+    """
+    total_pages = event_log.page_count(HISTORY_PAGE_SIZE)
+    page = 0
+    events = []
+    if total_pages:
+        events = show_history_page(event_log, page, total_pages)
+    else:
+        display_info(MESSAGES["HISTORY_EMPTY"])
+
+    deadline = time.ticks_add(time.ticks_ms(), HISTORY_IDLE_TIMEOUT * 1000)
+    while time.ticks_diff(deadline, time.ticks_ms()) > 0:
+        zone = read_touch_zone(TITLE_HEIGHT)
+        if zone == "center" or (zone and not total_pages):
+            break
+        if zone == "top":
+            jump = event_log.page_back(events, page, HISTORY_PAGE_SIZE)
+            if jump != page:
+                page = jump
+                events = show_history_page(event_log, page, total_pages)
+        elif zone == "left" and page < total_pages - 1:
+            page += 1
+            events = show_history_page(event_log, page, total_pages)
+        elif zone == "right" and page > 0:
+            page -= 1
+            events = show_history_page(event_log, page, total_pages)
+        if zone:
+            deadline = time.ticks_add(time.ticks_ms(), HISTORY_IDLE_TIMEOUT * 1000)
+        time.sleep_ms(TOUCH_POLL_MS)
@@ -0,0 +1,321 @@
+import os
+import struct
+
+from config import (
+    EVENT_LOG_DIR,
+    EVENT_LOG_SEGMENT_RECORDS,
+    EVENT_LOG_MAX_BYTES
+)
+from utils import parse_event_time
+
+# Record layout: time, magnitude x10, distance km, latitude/longitude x1e4, unid, place
+RECORD_FORMAT = "<IhHii20s28s"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)  # 64 bytes
+
+# Per-segment index: record count, min event time, max event time, max magnitude x10
+INDEX_FORMAT = "<IIIh"
+INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+
+# Bytes reserved for the unid and place name fields of a record
+UNID_SIZE = 20
+PLACE_SIZE = 28
+
+# Number of most recent unids kept in RAM to skip events already logged
+RECENT_UNIDS = 64
+
+# Records read per chunk when seeding the recent unids at startup
+SEED_CHUNK = 8
+
+def pack_earthquake(earthquake):
+    """Pack an earthquake dict from the API into a fixed-size record"""
+    try:
+        event_time = int(parse_event_time(earthquake.get('timestamp', '')))
+    except (ValueError, IndexError, AttributeError):
+        event_time = 0
+
+    return struct.pack(
+        RECORD_FORMAT,
+        max(0, event_time),
+        round((earthquake.get('magnitude') or 0.0) * 10),
+        min(int(earthquake.get('distance') or 0), 0xFFFF),
+        int((earthquake.get('latitude') or 0.0) * 10000),
+        int((earthquake.get('longitude') or 0.0) * 10000),
+        (earthquake.get('unid') or '').encode()[:UNID_SIZE],
+        (earthquake.get('place') or 'Unknown').encode()[:PLACE_SIZE]
+    )
+
+def _decode(raw):
+    """Decode a zero-padded bytes field, dropping a character cut by truncation"""
+    raw = raw.rstrip(b'\x00')
+    for _ in range(4):
+        try:
+            return raw.decode()
+        except UnicodeError:
+            raw = raw[:-1]
+    return ''
+
+def dedup_key(event):
+    """
+    Key an unpacked record for deduplication: its unid as stored, or its
+    time and place when the API gave no unid.
+    """
+    return event['unid'] or (event['time'], event['place'])
+
+def unpack_earthquake(buf, offset=0):
+    """Unpack a record at offset into an earthquake dict"""
+    event_time, mag, distance, lat, lon, unid, place = struct.unpack_from(RECORD_FORMAT, buf, offset)
+    return {
+        'time': event_time,
+        'magnitude': mag / 10,
+        'distance': distance,
+        'latitude': lat / 10000,
+        'longitude': lon / 10000,
+        'unid': _decode(unid),
+        'place': _decode(place)
+    }
+
+class EventLog:
+    """
+    Append-only earthquake log stored as fixed-size records in segment files.
+
+    Each segment NNNNNNNN.bin has an NNNNNNNN.idx sidecar holding its record
+    count, event time range and strongest magnitude. Only the indexes are kept in RAM;
+    pages are read from flash on demand. Oldest segments are deleted once the
+    log grows beyond max_bytes.
+    """
+
+    def __init__(self, directory=EVENT_LOG_DIR, segment_records=EVENT_LOG_SEGMENT_RECORDS,
+                 max_bytes=EVENT_LOG_MAX_BYTES):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_bytes = max_bytes
+        self._segments = []  # [seq, count, min_time, max_time, max_mag], oldest first
+        self._sealed = False  # Last segment has a torn tail and must not be appended to
+        self._recent = set()
+        self._page_buf = bytearray(0)
+        self._open()
+
+    def _path(self, seq, ext):
+        return "{}/{:08d}.{}".format(self.directory, seq, ext)
+
+    def _open(self):
+        """Load segment indexes from flash, rebuilding any that are stale"""
+        try:
+            os.mkdir(self.directory)
+        except OSError:
+            pass  # Already exists
+
+        seqs = sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".bin"))
+        for seq in seqs:
+            size = os.stat(self._path(seq, "bin"))[6]
+            self._segments.append(self._load_index(seq, size // RECORD_SIZE))
+            self._sealed = size % RECORD_SIZE != 0
+
+        self._seed_recent()
+
+    def _load_index(self, seq, count):
+        """Read a segment index, falling back to a rescan if it does not match the data"""
+        try:
+            with open(self._path(seq, "idx"), "rb") as f:
+                data = f.read(INDEX_SIZE)
+            if len(data) == INDEX_SIZE:
+                entry = [seq] + list(struct.unpack(INDEX_FORMAT, data))
+                if entry[1] == count:
+                    return entry
+        except OSError:
+            pass
+
+        print("Rebuilding event log index:", seq)
+        entry = [seq, 0, 0, 0, 0]
+        record = bytearray(RECORD_SIZE)
+        with open(self._path(seq, "bin"), "rb") as f:
+            for _ in range(count):
+                f.readinto(record)
+                self._update_index(entry, record)
+        self._write_index(entry)
+        return entry
+
+    def _update_index(self, entry, record):
+        """Fold a packed record into a segment index entry"""
+        event_time, mag = struct.unpack_from("<Ih", record, 0)
+        if entry[1] == 0:
+            entry[4] = mag
+        entry[1] += 1
+        entry[4] = max(entry[4], mag)
+
+        # Events can be published late, so track the range rather than append order.
+        # A time of 0 means the timestamp could not be parsed and is left out.
+        if event_time:
+            if not entry[2] or event_time < entry[2]:
+                entry[2] = event_time
+            entry[3] = max(entry[3], event_time)
+
+    def _write_index(self, entry):
+        with open(self._path(entry[0], "idx"), "wb") as f:
+            f.write(struct.pack(INDEX_FORMAT, entry[1], entry[2], entry[3], entry[4]))
+
+    def _seed_recent(self):
+        """Remember the unids at the end of the log so a reboot does not log them twice"""
+        buf = bytearray(SEED_CHUNK * RECORD_SIZE)
+        for page in range(RECENT_UNIDS // SEED_CHUNK):
+            events = self._read_page_into(buf, page, SEED_CHUNK)
+            for event in events:
+                self._recent.add(dedup_key(event))
+            if len(events) < SEED_CHUNK:
+                break
+
+    def _evict(self):
+        """Delete the oldest segments while the log is over its size budget"""
+        while len(self._segments) > 1 and self.size_bytes() > self.max_bytes:
+            seq = self._segments.pop(0)[0]
+            print("Evicting event log segment:", seq)
+            for ext in ("bin", "idx"):
+                try:
+                    os.remove(self._path(seq, ext))
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return sum(entry[1] for entry in self._segments)
+
+    def size_bytes(self):
+        return len(self) * RECORD_SIZE
+
+    def segments(self):
+        """Return (count, min_time, max_time, max_magnitude) per segment, oldest first"""
+        return [(e[1], e[2], e[3], e[4] / 10) for e in self._segments]
+
+    def append(self, earthquake):
+        """Append one earthquake to the newest segment, rolling over when it is full"""
+        self._append_record(pack_earthquake(earthquake))
+
+    def _append_record(self, record):
+        if not self._segments or self._sealed or self._segments[-1][1] >= self.segment_records:
+            seq = self._segments[-1][0] + 1 if self._segments else 0
+            self._segments.append([seq, 0, 0, 0, 0])
+            self._sealed = False
+
+        entry = self._segments[-1]
+        with open(self._path(entry[0], "bin"), "ab") as f:
+            f.write(record)
+        self._update_index(entry, record)
+        self._write_index(entry)
+        self._evict()
+
+    def append_new(self, earthquakes):
+        """Append earthquakes not logged yet, oldest first. Returns the number appended."""
+        # Keys are taken from the packed record so they match those seeded from flash
+        keys = []
+        added = 0
+        for earthquake in sorted(earthquakes, key=lambda eq: eq.get('timestamp') or ''):
+            record = pack_earthquake(earthquake)
+            key = dedup_key(unpack_earthquake(record))
+            keys.append(key)
+            if key in self._recent:
+                continue
+            self._append_record(record)
+            self._recent.add(key)
+            added += 1
+
+        # Events that left the API query window will not be returned again
+        if len(self._recent) > RECENT_UNIDS:
+            self._recent = set(keys)
+        return added
+
+    def page_count(self, page_size):
+        return (len(self) + page_size - 1) // page_size
+
+    def page_before(self, event_time, page_size):
+        """
+        Return the page holding the newest event at or before event_time.
+        The index skips segments whose events are all newer; inside the
+        segment found, records are binary-searched by their time field alone.
+        """
+        skipped = 0
+        for entry in reversed(self._segments):
+            if entry[2] and entry[2] > event_time:
+                skipped += entry[1]
+                continue
+            if entry[3] > event_time:
+                skipped += entry[1] - 1 - self._last_record_at_or_before(entry, event_time)
+            break
+        return min(skipped // page_size, max(self.page_count(page_size) - 1, 0))
+
+    def page_back(self, events, page, page_size, seconds=86400):
+        """
+        Return the page holding events `seconds` before the oldest known time in
+        events, the page currently shown. Unknown times (0) are ignored and the
+        page is returned unchanged when none is known.
+        """
+        known = [event['time'] for event in events if event['time']]
+        last_page = self.page_count(page_size) - 1
+        if not known or page >= last_page:
+            return page
+        return min(max(page + 1, self.page_before(min(known) - seconds, page_size)), last_page)
+
+    def _last_record_at_or_before(self, entry, event_time):
+        """
+        Binary-search a segment for its last record at or before event_time,
+        reading only the 4-byte time field of each probed record. Records are
+        in append order, which is close to time order; an unknown time (0)
+        counts as older.
+        """
+        time_buf = bytearray(4)
+        found = 0
+        lo, hi = 0, entry[1] - 1
+        with open(self._path(entry[0], "bin"), "rb") as f:
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                f.seek(mid * RECORD_SIZE)
+                if (f.readinto(time_buf) or 0) < len(time_buf):
+                    hi = mid - 1  # Segment shrank since it was indexed
+                    continue
+                if struct.unpack_from("<I", time_buf, 0)[0] <= event_time:
+                    found = mid
+                    lo = mid + 1
+                else:
+                    hi = mid - 1
+        return found
+
+    def read_page(self, page, page_size):
+        """
+        Read one page of events, newest first, without loading the rest of the log.
+        Page 0 holds the most recent events.
+        """
+        if len(self._page_buf) < page_size * RECORD_SIZE:
+            self._page_buf = bytearray(page_size * RECORD_SIZE)
+        return self._read_page_into(self._page_buf, page, page_size)
+
+    def _read_page_into(self, buf, page, page_size):
+        """Read one page of events, newest first, through buf"""
+        events = []
+        skip = page * page_size
+        needed = page_size
+        for entry in reversed(self._segments):
+            count = entry[1]
+            if skip >= count:
+                skip -= count
+                continue
+
+            # Newest-first positions skip..skip+n map to records count-skip-n..count-skip
+            n = min(needed, count - skip)
+            first = count - skip - n
+            view = memoryview(buf)[:n * RECORD_SIZE]
+            with open(self._path(entry[0], "bin"), "rb") as f:
+                f.seek(first * RECORD_SIZE)
+                read = f.readinto(view) or 0
+            if read < len(view):
+                # Segment shrank since it was indexed; only whole records read are valid
+                print("Short event log read:", entry[0])
+                for i in range(read // RECORD_SIZE - 1, -1, -1):
+                    events.append(unpack_earthquake(view, i * RECORD_SIZE))
+                break
+            for i in range(n - 1, -1, -1):
+                events.append(unpack_earthquake(view, i * RECORD_SIZE))
+
+            needed -= n
+            skip = 0
+            if not needed:
+                break
+
+        return events
@@ -9,6 +9,7 @@ import gc
 from config import (
     CHECK_INTERVAL_MINUTES,
     ERROR_MESSAGE_MAX_LENGTH,
+    TOUCH_POLL_MS,
 )
 from display import (
     display_info,
@@ -18,16 +19,56 @@ from display import (
     display_earthquake_alert,
     MESSAGES,
     show_startup_message,
-    format_earthquake_message
+    format_earthquake_message,
+    browse_history
 )
 from api import fetch_earthquakes
+from event_log import EventLog
 from utils import format_time
-from device import initialize_device, play_tone_alert, set_display_brightness
+from device import initialize_device, play_tone_alert, set_display_brightness, read_touch_zone
 from network_utils import connect_wifi, sync_time_with_ntp, ensure_wifi_connection
 
+def show_message(message, message_type):
+    """Display a formatted message using the template for its type"""
+    if message_type == "alert":
+        display_earthquake_alert(message)
+    elif message_type == "success":
+        display_success(message)
+    elif message_type == "warning":
+        display_warning(message)
+    else:
+        display_info(message)
+
+def open_event_log():
+    """Open the on-flash event log, or return None if flash is unavailable"""
+    try:
+        return EventLog()
+    except Exception as e:
+        print("Event log error:", e)
+        return None
+
+def log_earthquakes(event_log, earthquakes):
+    """Append newly seen earthquakes to the event log"""
+    try:
+        added = event_log.append_new(earthquakes)
+        if added:
+            print("Logged {} new earthquake(s)".format(added))
+    except Exception as e:
+        print("Event log error:", e)
+
+def wait_for_next_check(event_log, message, message_type):
+    """Sleep until the next check, opening the history screen when touched"""
+    deadline = time.ticks_add(time.ticks_ms(), CHECK_INTERVAL_MINUTES * 60 * 1000)
+    while time.ticks_diff(deadline, time.ticks_ms()) > 0:
+        if event_log is not None and read_touch_zone():
+            browse_history(event_log)
+            show_message(message, message_type)
+        time.sleep_ms(TOUCH_POLL_MS)
+
 def monitoring_loop():
     """Main monitoring loop"""
     last_earthquake_unid = None
+    event_log = open_event_log()
     while True:
         try:
             # Set brightness
@@ -40,6 +81,10 @@ def monitoring_loop():
             # Fetch earthquake data
             earthquakes, total_found = fetch_earthquakes()
             check_timestamp = format_time()
+
+            # Keep a history of every earthquake in range
+            if event_log is not None and earthquakes:
+                log_earthquakes(event_log, earthquakes)
             
             earthquake_to_display = None
             
@@ -58,21 +103,13 @@ def monitoring_loop():
             
             # Format and display message
             message, message_type = format_earthquake_message(earthquake_to_display, total_found, check_timestamp)
-            
-            if message_type == "alert":
-                display_earthquake_alert(message)
-            elif message_type == "success":
-                display_success(message)
-            elif message_type == "warning":
-                display_warning(message)
-            else:
-                display_info(message)
+            show_message(message, message_type)
             
             # Clean up memory
             gc.collect()
             
-            # Wait for next check
-            time.sleep(CHECK_INTERVAL_MINUTES * 60)
+            # Wait for next check, letting a touch open the history screen
+            wait_for_next_check(event_log, message, message_type)
             
         except KeyboardInterrupt:
             display_info(MESSAGES["STOPPING"])
@@ -0,0 +1,17 @@
+"""
+Host-side test setup. The firmware modules import settings from config.py,
+which is not tracked, so a stub built from config.template.py is installed
+as the `config` module.
+"""
+
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+config = types.ModuleType("config")
+with open(os.path.join(ROOT, "config.template.py")) as f:
+    exec(f.read(), config.__dict__)
+sys.modules["config"] = config
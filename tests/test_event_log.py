@@ -0,0 +1,290 @@
+import os
+import struct
+
+import pytest
+
+import event_log
+from event_log import (
+    EventLog, RECORD_FORMAT, RECORD_SIZE, INDEX_FORMAT, INDEX_SIZE, UNID_SIZE
+)
+
+BASE_TIME = 1700000000
+
+def make_earthquake(i, minutes=None, magnitude=None, unid=None):
+    """Build an earthquake dict like api.parse_earthquake_feature returns"""
+    minutes = i if minutes is None else minutes
+    return {
+        'unid': unid or "EQ{:06d}".format(i),
+        'magnitude': (i % 70) / 10 if magnitude is None else magnitude,
+        'place': "PLACE {}".format(i),
+        'distance': i % 500,
+        'latitude': 40.5,
+        'longitude': -3.25,
+        'timestamp': "2024-07-{:02d}T{:02d}:{:02d}:00.000Z".format(
+            1 + minutes // 1440, (minutes // 60) % 24, minutes % 60
+        ),
+    }
+
+def read_index(directory, seq):
+    with open("{}/{:08d}.idx".format(directory, seq), "rb") as f:
+        return struct.unpack(INDEX_FORMAT, f.read(INDEX_SIZE))
+
+def rescan(directory, seq):
+    """Compute a segment index from its data file"""
+    with open("{}/{:08d}.bin".format(directory, seq), "rb") as f:
+        data = f.read()
+    count = len(data) // RECORD_SIZE
+    times = [struct.unpack_from(RECORD_FORMAT, data, i * RECORD_SIZE)[0] for i in range(count)]
+    mags = [struct.unpack_from(RECORD_FORMAT, data, i * RECORD_SIZE)[1] for i in range(count)]
+    known = [t for t in times if t]
+    return (count, min(known, default=0), max(known, default=0), max(mags, default=0))
+
+def seg_files(directory):
+    return sorted(name for name in os.listdir(directory))
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / "events")
+
+def test_index_matches_rescan_with_late_events(log_dir):
+    log = EventLog(log_dir, segment_records=4, max_bytes=1 << 20)
+    # Minutes out of order: late-published events are appended after newer ones
+    for i, minutes in enumerate([50, 10, 70, 5, 30, 90, 20]):
+        log.append(make_earthquake(i, minutes=minutes))
+    log.append({'unid': 'BADTIME', 'magnitude': 6.1, 'timestamp': 'garbage'})
+
+    for seq in (0, 1):
+        assert read_index(log_dir, seq) == rescan(log_dir, seq)
+
+    count, min_time, max_time, max_mag = log.segments()[0]
+    assert count == 4
+    assert min_time == read_index(log_dir, 0)[1] < max_time
+    # Segment 1 holds minutes 30, 90, 20 and an unparsable time that is left out
+    assert rescan(log_dir, 1)[1] == read_index(log_dir, 1)[1]
+    assert log.segments()[1][3] == 6.1
+
+@pytest.mark.parametrize("damage", ["missing", "stale"])
+def test_bad_index_is_rebuilt(log_dir, damage):
+    log = EventLog(log_dir, segment_records=8, max_bytes=1 << 20)
+    for i in range(5):
+        log.append(make_earthquake(i))
+    expected = log.segments()
+
+    path = "{}/{:08d}.idx".format(log_dir, 0)
+    if damage == "missing":
+        os.remove(path)
+    else:
+        with open(path, "wb") as f:
+            f.write(struct.pack(INDEX_FORMAT, 2, 0, 0, 0))
+
+    reopened = EventLog(log_dir, segment_records=8, max_bytes=1 << 20)
+    assert reopened.segments() == expected
+    assert read_index(log_dir, 0) == rescan(log_dir, 0)
+
+def test_torn_tail_seals_segment(log_dir):
+    log = EventLog(log_dir, segment_records=8, max_bytes=1 << 20)
+    for i in range(3):
+        log.append(make_earthquake(i))
+    with open("{}/{:08d}.bin".format(log_dir, 0), "ab") as f:
+        f.write(b"xx")
+
+    reopened = EventLog(log_dir, segment_records=8, max_bytes=1 << 20)
+    assert len(reopened) == 3
+    reopened.append(make_earthquake(3))
+
+    assert os.stat("{}/{:08d}.bin".format(log_dir, 0))[6] == 3 * RECORD_SIZE + 2
+    assert os.stat("{}/{:08d}.bin".format(log_dir, 1))[6] == RECORD_SIZE
+    assert [e['unid'] for e in reopened.read_page(0, 4)] == [
+        "EQ000003", "EQ000002", "EQ000001", "EQ000000"
+    ]
+
+def test_eviction_keeps_size_within_budget(log_dir):
+    max_bytes = 10 * RECORD_SIZE
+    log = EventLog(log_dir, segment_records=4, max_bytes=max_bytes)
+    for i in range(30):
+        log.append(make_earthquake(i))
+        assert log.size_bytes() <= max_bytes
+
+    seqs = [int(name[:-4]) for name in seg_files(log_dir) if name.endswith(".bin")]
+    assert seqs == [5, 6, 7]
+    assert seg_files(log_dir) == [
+        "{:08d}.{}".format(seq, ext) for seq in seqs for ext in ("bin", "idx")
+    ]
+    assert [e['unid'] for e in log.read_page(0, 3)] == ["EQ000029", "EQ000028", "EQ000027"]
+
+def test_dedup_survives_reopen_with_long_unid(log_dir):
+    batch = [make_earthquake(i, unid="{:06d}".format(i) + "X" * UNID_SIZE) for i in range(3)]
+    batch += [make_earthquake(3)]
+    log = EventLog(log_dir)
+    assert log.append_new(batch) == 4
+    assert log.append_new(batch) == 0
+
+    reopened = EventLog(log_dir)
+    assert reopened.append_new(batch) == 0
+    assert len(reopened) == 4
+
+def test_dedup_events_without_unid_on_time_and_place(log_dir):
+    batch = [make_earthquake(i, unid='') for i in range(3)]
+    batch[2]['unid'] = None
+    log = EventLog(log_dir)
+    assert log.append_new(batch) == 3
+    assert log.append_new(batch) == 0
+
+    reopened = EventLog(log_dir)
+    assert reopened.append_new(batch + [make_earthquake(3, unid='')]) == 1
+    assert len(reopened) == 4
+
+def test_short_read_returns_only_whole_records(log_dir):
+    log = EventLog(log_dir, segment_records=8, max_bytes=1 << 20)
+    for i in range(6):
+        log.append(make_earthquake(i))
+    log.read_page(0, 4)  # Fill the page buffer with records 5..2
+
+    path = "{}/{:08d}.bin".format(log_dir, 0)
+    with open(path, "r+b") as f:
+        f.truncate(4 * RECORD_SIZE + 10)
+
+    # Page 0 maps to records 2..5, of which only 2 and 3 are still on flash
+    assert [e['unid'] for e in log.read_page(0, 4)] == ["EQ000003", "EQ000002"]
+
+def test_page_before_skips_newer_segments(log_dir):
+    log = EventLog(log_dir, segment_records=4, max_bytes=1 << 20)
+    for i in range(12):
+        log.append(make_earthquake(i, minutes=i * 720))  # Two events per day
+
+    # Segments hold days 1-2, 3-4 and 5-6; the newest one starts after day 3
+    day_3 = log.segments()[1][1]
+    assert log.page_before(day_3 - 1, 2) == 4
+    # Event 4 opens segment 1 and is 7th newest overall
+    assert log.page_before(day_3, 2) == 3
+    assert log.page_before(0, 2) == 5
+    assert log.page_before(log.segments()[2][2], 2) == 0
+
+def test_page_before_searches_inside_segment(log_dir, monkeypatch):
+    log = EventLog(log_dir, segment_records=256, max_bytes=1 << 20)
+    for i in range(400):
+        log.append(make_earthquake(i, minutes=i * 72))  # 20 events per day
+
+    calls = []
+    real_open = open
+    monkeypatch.setattr(event_log, "open", lambda path, mode: CountingFile(real_open(path, mode), calls),
+                        raising=False)
+
+    # Events are BASE..+399 steps of 72 minutes; positions count back from the newest (i=399)
+    step = 72 * 60
+    t0 = log.read_page(399, 1)[0]['time']
+    for i in (0, 100, 255, 256, 300, 398):
+        calls.clear()
+        target = t0 + i * step + step // 2  # Between events i and i+1
+        assert log.page_before(target, 1) == 399 - i
+        assert log.page_before(target, 4) == (399 - i) // 4
+        # Only 4-byte time fields are read: at most log2(256) + 1 probes per search
+        assert all(n == 4 for name, n in calls if name == "readinto")
+        assert len(calls) <= 2 * 2 * 9
+
+    # One day back from the newest page lands 20 events further, not one page
+    newest = log.read_page(0, 4)
+    assert log.page_before(newest[-1]['time'] - 86400, 4) == 5
+
+def test_page_back_jumps_one_day_from_shown_page(log_dir):
+    log = EventLog(log_dir, segment_records=256, max_bytes=1 << 20)
+    for i in range(400):
+        log.append(make_earthquake(i, minutes=i * 72))  # 20 events per day
+    last_page = log.page_count(4) - 1
+
+    def unids(page):
+        return [e['unid'] for e in log.read_page(page, 4)]
+
+    # Page 0 shows events 399..396; a day before 396 is event 376, at position 23
+    page = log.page_back(log.read_page(0, 4), 0, 4)
+    assert page == 5
+    assert "EQ000376" in unids(page)
+
+    # Page 5 shows 379..376, so the next day back is event 356
+    page = log.page_back(log.read_page(page, 4), page, 4)
+    assert "EQ000356" in unids(page)
+
+    # Jumping past the start of the log stops at the last page
+    assert log.page_back(log.read_page(last_page - 1, 4), last_page - 1, 4) == last_page
+    assert log.page_back(log.read_page(last_page, 4), last_page, 4) == last_page
+
+def test_page_back_ignores_unknown_times(log_dir):
+    log = EventLog(log_dir, segment_records=256, max_bytes=1 << 20)
+    for i in range(300):
+        log.append(make_earthquake(i, minutes=i * 72))
+    log.append({'unid': 'NOTIME', 'magnitude': 3.0, 'timestamp': 'garbage'})
+    log.append({'unid': 'NOTIME2', 'magnitude': 3.0, 'timestamp': ''})
+
+    # Page 0 holds both unknown times plus events 299 and 298
+    events = log.read_page(0, 4)
+    assert [e['time'] for e in events[:2]] == [0, 0]
+    page = log.page_back(events, 0, 4)
+    assert "EQ000278" in [e['unid'] for e in log.read_page(page, 4)]
+
+    # A page with no known time does not move
+    assert log.page_back(events[:2], 0, 4) == 0
+
+MILLION = 1000000
+BIG_SEGMENT = 4096
+
+@pytest.fixture(scope="module")
+def million_log_dir(tmp_path_factory):
+    """Write segment files for a million records directly; appending them one by one is too slow"""
+    directory = str(tmp_path_factory.mktemp("million"))
+    for seq in range((MILLION + BIG_SEGMENT - 1) // BIG_SEGMENT):
+        first = seq * BIG_SEGMENT
+        n = min(BIG_SEGMENT, MILLION - first)
+        with open("{}/{:08d}.bin".format(directory, seq), "wb") as f:
+            f.write(b"".join(
+                struct.pack(RECORD_FORMAT, BASE_TIME + i, i % 90, 1, 0, 0, b"%d" % i, b"P")
+                for i in range(first, first + n)
+            ))
+        with open("{}/{:08d}.idx".format(directory, seq), "wb") as f:
+            f.write(struct.pack(INDEX_FORMAT, n, BASE_TIME + first, BASE_TIME + first + n - 1, 89))
+    return directory
+
+class CountingFile:
+    """File wrapper recording seek and readinto calls"""
+
+    def __init__(self, f, calls):
+        self.f = f
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+    def seek(self, offset):
+        self.calls.append(("seek", offset))
+        return self.f.seek(offset)
+
+    def readinto(self, buf):
+        n = self.f.readinto(buf)
+        self.calls.append(("readinto", n))
+        return n
+
+@pytest.mark.parametrize("page,page_size,segments_read", [
+    (0, 4, 1),
+    (1000, 4, 1),
+    (124999, 4, 1),
+    (249999, 4, 1),
+    # 1,000,000 = 244 full segments + 576 records, so positions 575..579 span two segments
+    (115, 5, 2),
+])
+def test_million_records_page_read_cost(million_log_dir, monkeypatch, page, page_size, segments_read):
+    log = EventLog(million_log_dir, segment_records=BIG_SEGMENT, max_bytes=MILLION * RECORD_SIZE)
+    assert len(log) == MILLION
+
+    calls = []
+    real_open = open
+    monkeypatch.setattr(event_log, "open", lambda path, mode: CountingFile(real_open(path, mode), calls),
+                        raising=False)
+    events = log.read_page(page, page_size)
+
+    newest = MILLION - 1 - page * page_size
+    assert [e['time'] - BASE_TIME for e in events] == list(range(newest, newest - page_size, -1))
+    assert [name for name, _ in calls] == ["seek", "readinto"] * segments_read
+    assert sum(n for name, n in calls if name == "readinto") == page_size * RECORD_SIZE
+    assert len(log._page_buf) == page_size * RECORD_SIZE
@@ -9,6 +9,39 @@ def format_time():
     t = time.gmtime(local_time)
     return "{:02d}:{:02d}:{:02d}".format(t[3], t[4], t[5])
 
+def parse_event_time(iso_timestamp):
+    """
+    Convert an ISO timestamp to UTC seconds since the epoch.
+    Example input: "2024-07-20T10:32:17.110Z"
+    Raises ValueError or IndexError on malformed input.
+    """
+    # 1. Parse ISO string to get date and time components
+    # e.g., "2024-07-20T10:32:17.110Z"
+    date_part, time_part_full = iso_timestamp.split('T')
+
+    # "2024-07-20" -> (2024, 7, 20)
+    year, month, day = [int(p) for p in date_part.split('-')]
+
+    # "10:32:17.110Z" -> "10:32:17" -> (10, 32, 17)
+    time_part = time_part_full.split('.')[0]
+    h, m, s = [int(p) for p in time_part.split(':')]
+
+    # 2. Create a time tuple for MicroPython's time.mktime.
+    # It requires a 9-tuple: (year, month, mday, hour, minute, second, weekday, yearday, isdst)
+    # Weekday, yearday, and isdst can be dummy values.
+    event_utc_tuple = (year, month, day, h, m, s, 0, 0, 0)
+
+    # 3. Convert the UTC tuple to seconds since the epoch.
+    # On a system where the clock is UTC (set by NTP), mktime treats the tuple as UTC.
+    return time.mktime(event_utc_tuple)
+
+def format_log_time(event_utc_seconds):
+    """Format UTC seconds as a local "MM-DD HH:MM" string for the history screen"""
+    if not event_utc_seconds:
+        return "Unknown"
+    t = time.gmtime(event_utc_seconds + (TIMEZONE_OFFSET_HOURS * 3600))
+    return "{:02d}-{:02d} {:02d}:{:02d}".format(t[1], t[2], t[3], t[4])
+
 def format_event_time(iso_timestamp):
     """
     Get earthquake event time as a string with local timezone from an ISO timestamp.
@@ -18,34 +51,16 @@ def format_event_time(iso_timestamp):
         return "Unknown"
     
     try:
-        # 1. Parse ISO string to get date and time components
-        # e.g., "2024-07-20T10:32:17.110Z"
-        date_part, time_part_full = iso_timestamp.split('T')
-        
-        # "2024-07-20" -> (2024, 7, 20)
-        year, month, day = [int(p) for p in date_part.split('-')]
-        
-        # "10:32:17.110Z" -> "10:32:17" -> (10, 32, 17)
-        time_part = time_part_full.split('.')[0]
-        h, m, s = [int(p) for p in time_part.split(':')]
-
-        # 2. Create a time tuple for MicroPython's time.mktime.
-        # It requires a 9-tuple: (year, month, mday, hour, minute, second, weekday, yearday, isdst)
-        # Weekday, yearday, and isdst can be dummy values.
-        event_utc_tuple = (year, month, day, h, m, s, 0, 0, 0)
-
-        # 3. Convert the UTC tuple to seconds since the epoch.
-        # On a system where the clock is UTC (set by NTP), mktime treats the tuple as UTC.
-        event_utc_seconds = time.mktime(event_utc_tuple)
+        event_utc_seconds = parse_event_time(iso_timestamp)
         
-        # 4. Apply the timezone offset to get local time in seconds.
+        # 1. Apply the timezone offset to get local time in seconds.
         event_local_seconds = event_utc_seconds + (TIMEZONE_OFFSET_HOURS * 3600)
         
-        # 5. Convert local time in seconds back to a time tuple.
+        # 2. Convert local time in seconds back to a time tuple.
         # Use time.gmtime() to format seconds into a tuple without extra timezone conversion.
         t = time.gmtime(event_local_seconds)
         
-        # 6. Format the time part.
+        # 3. Format the time part.
         return "{:02d}:{:02d}:{:02d}".format(t[3], t[4], t[5])
 
     except (ValueError, IndexError) as e: